@@ -8,9 +8,46 @@ from ukdbtool.pack.build import build_pack, init_pack_skeleton
 from ukdbtool.pack.validate import validate_pack
 from ukdbtool.pack.hash import write_integrity_hashes
 from ukdbtool.pack.export import export_repo_pack
+from ukdbtool.pack.importer import DEFAULT_CHUNK_SIZE, import_dataset
+from ukdbtool.pack.shards import load_layout
 
 console = Console()
 
+# id_range needs boundaries, which only ukdb.yaml can declare
+_CLI_PARTITION_SCHEMES = ("none", "hash")
+
+
+def _positive_int(value: str) -> int:
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}") from None
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return n
+
+
+def _parse_shard_args(parser: argparse.ArgumentParser, values: list[str]) -> dict | None:
+    """Parse repeated `--shard KIND=COUNT[:SCHEME]` options into a manifest `shards` section."""
+    shards: dict = {}
+    for value in values:
+        kind, _, spec = value.partition("=")
+        count, _, scheme = spec.partition(":")
+        if not kind or not count.isdigit():
+            parser.error(f"--shard expects KIND=COUNT[:SCHEME], got {value!r}")
+        if kind in shards:
+            parser.error(f"--shard: record kind {kind!r} given more than once")
+        if scheme == "id_range":
+            parser.error("--shard: id_range boundaries must be declared in ukdb.yaml")
+        if scheme and scheme not in _CLI_PARTITION_SCHEMES:
+            parser.error(f"--shard: SCHEME must be one of {', '.join(_CLI_PARTITION_SCHEMES)}")
+        shards[kind] = {"count": int(count), "partition": {"scheme": scheme or "none"}}
+    try:
+        load_layout({"shards": shards})
+    except ValueError as e:
+        parser.error(f"--shard: {e}")
+    return shards or None
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(prog="ukdb", description="UKDB Pack tooling")
@@ -18,16 +55,39 @@ def main() -> None:
 
     p_init = sub.add_parser("init", help="Create an empty UKDB pack skeleton")
     p_init.add_argument("path", type=Path)
+    p_init.add_argument(
+        "--shard",
+        action="append",
+        default=[],
+        metavar="KIND=COUNT[:SCHEME]",
+        help="Split a record kind into COUNT shards (SCHEME: none, hash)",
+    )
 
     p_build = sub.add_parser("build", help="Build a UKDB pack from an input directory")
     p_build.add_argument("input_dir", type=Path)
     p_build.add_argument("out_pack", type=Path)
+    p_build.add_argument(
+        "--shard",
+        action="append",
+        default=[],
+        metavar="KIND=COUNT[:SCHEME]",
+        help="Split a record kind into COUNT shards (see init)",
+    )
+    p_build.add_argument(
+        "--workers", type=_positive_int, default=None, help="Parallel hashing workers"
+    )
 
     p_validate = sub.add_parser("validate", help="Validate a UKDB pack against schemas")
     p_validate.add_argument("pack", type=Path)
+    p_validate.add_argument(
+        "--workers", type=_positive_int, default=None, help="Parallel shard validators"
+    )
 
     p_hash = sub.add_parser("hash", help="Compute integrity hashes and write to manifest")
     p_hash.add_argument("pack", type=Path)
+    p_hash.add_argument(
+        "--workers", type=_positive_int, default=None, help="Parallel hashing workers"
+    )
 
     p_export = sub.add_parser(
         "export",
@@ -36,27 +96,74 @@ def main() -> None:
     p_export.add_argument("repo_root", type=Path)
     p_export.add_argument("out_pack", type=Path)
 
+    p_import = sub.add_parser(
+        "import",
+        help="Stream a CSV/NDJSON dataset through a mapping into pack records",
+    )
+    p_import.add_argument("dataset", type=Path)
+    p_import.add_argument("pack", type=Path)
+    p_import.add_argument("--mapping", type=Path, required=True, help="Mapping YAML file")
+    p_import.add_argument(
+        "--shard",
+        action="append",
+        default=[],
+        metavar="KIND=COUNT[:SCHEME]",
+        help="Split a record kind into COUNT shards when creating the pack (see init)",
+    )
+    p_import.add_argument(
+        "--workers", type=_positive_int, default=None, help="Parallel parser processes"
+    )
+    p_import.add_argument(
+        "--chunk-size", type=_positive_int, default=DEFAULT_CHUNK_SIZE, help="Bytes per parse chunk"
+    )
+
     args = parser.parse_args()
 
     if args.cmd == "init":
-        init_pack_skeleton(args.path)
+        init_pack_skeleton(args.path, shards=_parse_shard_args(parser, args.shard))
         console.print(f"[green]Created pack skeleton:[/green] {args.path}")
         return
 
     if args.cmd == "build":
-        build_pack(args.input_dir, args.out_pack)
+        build_pack(
+            args.input_dir,
+            args.out_pack,
+            shards=_parse_shard_args(parser, args.shard),
+            max_workers=args.workers,
+        )
         console.print(f"[green]Built pack:[/green] {args.out_pack}")
         return
 
     if args.cmd == "validate":
-        ok = validate_pack(args.pack)
+        ok = validate_pack(args.pack, max_workers=args.workers)
         raise SystemExit(0 if ok else 2)
 
     if args.cmd == "hash":
-        write_integrity_hashes(args.pack)
+        write_integrity_hashes(args.pack, max_workers=args.workers)
         console.print(f"[green]Wrote integrity hashes to manifest:[/green] {args.pack / 'ukdb.yaml'}")
         return
 
+    if args.cmd == "import":
+        try:
+            result = import_dataset(
+                args.dataset,
+                args.pack,
+                args.mapping,
+                shards=_parse_shard_args(parser, args.shard),
+                max_workers=args.workers,
+                chunk_size=args.chunk_size,
+            )
+        except (ValueError, OSError) as e:
+            console.print(f"[red]FAIL:[/red] {e}")
+            raise SystemExit(2)
+        counts = ", ".join(f"{kind}={n}" for kind, n in result.records.items())
+        rate = result.rows / result.seconds if result.seconds else 0
+        console.print(
+            "[green]Imported dataset:[/green] "
+            f"{result.pack_path} (rows={result.rows}, {counts}, {rate:,.0f} rows/s)"
+        )
+        return
+
     if args.cmd == "export":
         summary = export_repo_pack(args.repo_root, args.out_pack)
         size_mb = summary.size_bytes / (1024 * 1024)
@@ -3,23 +3,14 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 import shutil
-import json
 import time
 
-from ukdbtool.pack.hash import sha256_file
+from ukdbtool.pack.hash import sha256_files
+from ukdbtool.pack.shards import RecordWriter, load_layout
 from ukdbtool.io.yamlio import read_yaml, write_yaml
 
 
-EMPTY_NDJSON_FILES = [
-    "entities.ndjson",
-    "sources.ndjson",
-    "claims.ndjson",
-    "notes.ndjson",
-    "links.ndjson",
-]
-
-
-def init_pack_skeleton(path: Path) -> None:
+def init_pack_skeleton(path: Path, shards: dict | None = None) -> None:
     path = path if path.suffix == ".ukdb" else Path(str(path) + ".ukdb")
     path.mkdir(parents=True, exist_ok=True)
 
@@ -27,8 +18,8 @@ def init_pack_skeleton(path: Path) -> None:
         "ukdb_version": "0.2",
         "pack_id": f"pack_{int(time.time())}",
         "title": path.stem,
-        "created_at": _now_iso(),
-        "updated_at": _now_iso(),
+        "created_at": now_iso(),
+        "updated_at": now_iso(),
         "license": {"pack": "MIT", "blobs_default": "unknown"},
         "provenance": {"created_by": "human|tool", "generators": []},
         "languages": [],
@@ -36,71 +27,69 @@ def init_pack_skeleton(path: Path) -> None:
         "integrity": {"hash_alg": "sha256", "files": {}},
         "defaults": {"claim_confidence_bp": 6000, "source_preference_order": ["official", "reputable", "community", "uncited"]},
     }
+    if shards:
+        manifest["shards"] = shards
+    layout = load_layout(manifest)
     write_yaml(path / "ukdb.yaml", manifest)
 
-    for fn in EMPTY_NDJSON_FILES:
-        (path / fn).write_text("", encoding="utf-8")
+    for files in layout.values():
+        for rel in files.paths:
+            (path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (path / rel).write_text("", encoding="utf-8")
 
     (path / "blobs").mkdir(exist_ok=True)
 
 
-def build_pack(input_dir: Path, out_pack: Path) -> None:
+def build_pack(
+    input_dir: Path, out_pack: Path, shards: dict | None = None, max_workers: int | None = None
+) -> None:
     """
     MVP build strategy:
-    - create pack skeleton
+    - create pack skeleton (optionally with shard sets, see ukdbtool.pack.shards)
     - add each file in input_dir as a Source (type=file) with blob sha256
     - copy blobs to blobs/<sha256>.<ext>
-    - write sources.ndjson
+    - write sources.ndjson (or its shards)
     """
     input_dir = input_dir.resolve()
     pack_path = out_pack if out_pack.suffix == ".ukdb" else Path(str(out_pack) + ".ukdb")
     if pack_path.exists():
         shutil.rmtree(pack_path)
-    init_pack_skeleton(pack_path)
+    init_pack_skeleton(pack_path, shards=shards)
     pack = pack_path.resolve()
 
-    sources_path = pack / "sources.ndjson"
+    manifest_path = pack / "ukdb.yaml"
+    manifest = read_yaml(manifest_path)
     blobs_dir = pack / "blobs"
 
-    # clear sources
-    sources_path.write_text("", encoding="utf-8")
-
-    idx = 0
     files = [p for p in input_dir.rglob("*") if p.is_file()]
     files = sorted(files, key=lambda p: str(p.relative_to(input_dir)).replace("\\", "/"))
-    for p in files:
-        idx += 1
-        h = sha256_file(p)
-        ext = p.suffix.lower().lstrip(".") or "bin"
-        blob_name = f"{h}.{ext}"
-        dest = blobs_dir / blob_name
-        if not dest.exists():
-            shutil.copy2(p, dest)
-
-        src_obj = {
-            "id": f"src_{idx:06d}",
-            "type": "file",
-            "title": p.name,
-            "path": str(p.relative_to(input_dir)),
-            "retrieved_at": _now_iso(),
-            "license": "unknown",
-            "reliability": "uncited",
-            "blob": {"sha256": h, "mime": _guess_mime(p), "path": f"blobs/{blob_name}"},
-        }
-        _append_ndjson(sources_path, src_obj)
+    hashes = sha256_files(files, max_workers=max_workers)
+
+    with RecordWriter(pack, load_layout(manifest)["sources"], mode="w") as sources:
+        for idx, (p, h) in enumerate(zip(files, hashes), start=1):
+            ext = p.suffix.lower().lstrip(".") or "bin"
+            blob_name = f"{h}.{ext}"
+            dest = blobs_dir / blob_name
+            if not dest.exists():
+                shutil.copy2(p, dest)
+
+            src_obj = {
+                "id": f"src_{idx:06d}",
+                "type": "file",
+                "title": p.name,
+                "path": str(p.relative_to(input_dir)),
+                "retrieved_at": now_iso(),
+                "license": "unknown",
+                "reliability": "uncited",
+                "blob": {"sha256": h, "mime": _guess_mime(p), "path": f"blobs/{blob_name}"},
+            }
+            sources.write(src_obj)
 
     # update manifest timestamps
-    manifest_path = pack / "ukdb.yaml"
-    manifest = read_yaml(manifest_path)
-    manifest["updated_at"] = _now_iso()
+    manifest["updated_at"] = now_iso()
     write_yaml(manifest_path, manifest)
 
 
-def _append_ndjson(path: Path, obj: dict) -> None:
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
-
-
 def _guess_mime(p: Path) -> str:
     # keep simple for MVP
     ext = p.suffix.lower()
@@ -114,6 +103,6 @@ def _guess_mime(p: Path) -> str:
     }.get(ext, "application/octet-stream")
 
 
-def _now_iso() -> str:
+def now_iso() -> str:
     # naive ISO local; good enough for MVP
     return time.strftime("%Y-%m-%dT%H:%M:%S%z")
@@ -6,7 +6,7 @@ import json
 import shutil
 import time
 
-from ukdbtool.pack.build import init_pack_skeleton, _guess_mime, _now_iso  # type: ignore[attr-defined]
+from ukdbtool.pack.build import init_pack_skeleton, _guess_mime, now_iso  # type: ignore[attr-defined]
 from ukdbtool.pack.hash import sha256_file, write_integrity_hashes
 from ukdbtool.pack.validate import validate_pack
 from ukdbtool.io.yamlio import read_yaml, write_yaml
@@ -82,7 +82,7 @@ def export_repo_pack(repo_root: Path, out_pack: Path) -> ExportSummary:
             "type": "file",
             "title": p.name,
             "path": str(rel).replace("\\", "/"),
-            "retrieved_at": _now_iso(),
+            "retrieved_at": now_iso(),
             "license": "unknown",
             "reliability": "uncited",
             "blob": {
@@ -97,7 +97,7 @@ def export_repo_pack(repo_root: Path, out_pack: Path) -> ExportSummary:
     manifest_path = pack / "ukdb.yaml"
     manifest = read_yaml(manifest_path)
     manifest["title"] = "UKDB Repo Export"
-    manifest["updated_at"] = _now_iso()
+    manifest["updated_at"] = now_iso()
     write_yaml(manifest_path, manifest)
 
     # Validate and hash, failing loudly if validation fails
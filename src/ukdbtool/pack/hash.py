@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from ukdbtool.io.yamlio import read_yaml, write_yaml
+from ukdbtool.pack.shards import load_layout
 
 
 def sha256_file(path: Path) -> str:
@@ -13,22 +15,30 @@ def sha256_file(path: Path) -> str:
     return h.hexdigest()
 
 
-def write_integrity_hashes(pack: Path) -> None:
+def sha256_files(paths: list[Path], max_workers: int | None = None) -> list[str]:
+    # hashlib releases the GIL on large updates, so threads hash files in parallel
+    if len(paths) <= 1 or max_workers == 1:
+        return [sha256_file(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(sha256_file, paths))
+
+
+def write_integrity_hashes(pack: Path, max_workers: int | None = None) -> None:
     pack = pack if pack.suffix == ".ukdb" else Path(str(pack) + ".ukdb")
     manifest_path = pack / "ukdb.yaml"
     manifest = read_yaml(manifest_path)
 
-    files = {}
-    for fn in ["entities.ndjson", "sources.ndjson", "claims.ndjson", "notes.ndjson", "links.ndjson"]:
-        p = pack / fn
-        files[fn] = sha256_file(p)
+    names = [rel for files in load_layout(manifest).values() for rel in files.paths]
 
     # blobs optional
     blobs_dir = pack / "blobs"
     if blobs_dir.exists():
         for b in blobs_dir.iterdir():
             if b.is_file():
-                files[f"blobs/{b.name}"] = sha256_file(b)
+                names.append(f"blobs/{b.name}")
+
+    digests = sha256_files([pack / name for name in names], max_workers=max_workers)
+    files = dict(zip(names, digests))
 
     manifest.setdefault("integrity", {})
     manifest["integrity"]["hash_alg"] = "sha256"
@@ -0,0 +1,467 @@
+"""Streaming bulk import of CSV/NDJSON datasets into pack records.
+
+A mapping file (YAML) describes which records each input row produces:
+
+    format: csv              # csv | tsv | ndjson (default: from the dataset suffix)
+    encoding: utf-8
+    entities:
+      id: "ent_{employee_id}"
+      type: employee
+      name: "{name}"
+    claims:
+      - id: "clm_{employee_id}_salary"
+        subject: "ent_{employee_id}"
+        predicate: gross_salary
+        object:
+          type: money_cents
+          value: {field: salary, convert: cents}
+
+Strings are templates over plain `{field}` names (`{{`/`}}` for literal braces; no attribute,
+index, conversion or format spec), other scalars are literals, and
+`{field: ..., convert: ..., optional: ..., decimal: ...}` copies one field. Template and field
+values must be strings or numbers; missing, null and empty values are errors unless optional.
+`str` (the default) yields the value as a string; NDJSON numbers keep their source text.
+`int`, `cents` and `bp` parse decimal text directly into scaled integers, so no value passes
+through a float; extra non-zero decimals are an error, never rounded. Objects, arrays and
+booleans are rejected by every conversion. A leading UTF-8 BOM is skipped.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Formatter
+from typing import Callable, Iterator
+import csv
+import io
+import json
+import os
+import time
+
+from ukdbtool.pack.build import init_pack_skeleton, now_iso
+from ukdbtool.pack.hash import sha256_files
+from ukdbtool.pack.shards import RECORD_KINDS, RecordFiles, RecordWriter, load_layout
+from ukdbtool.io.yamlio import read_yaml, write_yaml
+
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# convert name -> number of implied decimal places
+_SCALES = {"int": 0, "cents": 2, "bp": 2}
+
+_FORMATS_BY_SUFFIX = {".csv": "csv", ".tsv": "tsv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+_MAPPING_OPTIONS = ("format", "encoding")
+_MAPPING_KEYS = (*RECORD_KINDS, *_MAPPING_OPTIONS)
+
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+_OMIT = object()
+
+
+@dataclass
+class ImportSummary:
+    pack_path: Path
+    rows: int
+    records: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def parse_scaled_int(text: str, scale: int, decimal: str = ".") -> int:
+    """Parse decimal text into an integer with `scale` implied decimals.
+
+    `parse_scaled_int("12.34", 2) == 1234`; `parse_scaled_int("25.5", 2) == 2550`.
+    """
+    s = text.strip()
+    if decimal != ".":
+        s = s.replace(decimal, ".")
+    sign = s[:1]
+    if sign in ("-", "+"):
+        s = s[1:]
+    whole, _, frac = s.partition(".")
+    digits = whole + frac
+    if not digits or not (digits.isascii() and digits.isdigit()):
+        raise ValueError(f"not a decimal number: {text!r}")
+    whole = whole or "0"
+    if len(frac) > scale:
+        if frac[scale:].strip("0"):
+            raise ValueError(f"{text!r} has more than {scale} decimal place(s)")
+        frac = frac[:scale]
+    value = int(whole + frac.ljust(scale, "0"))
+    return -value if sign == "-" else value
+
+
+def import_dataset(
+    dataset: Path,
+    pack: Path,
+    mapping_path: Path,
+    shards: dict | None = None,
+    max_workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ImportSummary:
+    """Stream `dataset` through the mapping and append the records to `pack`.
+
+    The pack is created (optionally sharded) when it does not exist. The dataset is cut into
+    record-aligned chunks that worker processes parse and map; results are written in input
+    order, one batch per chunk and shard, with at most two chunks per worker in flight.
+    The pack is only created after the mapping compiles and the dataset header is read.
+    Raises ValueError on the first bad row; records of earlier chunks are already written by
+    then. If the manifest already holds integrity digests, those of the appended files are
+    recomputed.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive number of bytes, got {chunk_size}")
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(f"max_workers must be a positive integer, got {max_workers}")
+    started = time.perf_counter()
+    pack = pack if pack.suffix == ".ukdb" else Path(str(pack) + ".ukdb")
+    if shards and pack.exists():
+        raise ValueError(f"shards can only be declared when creating a new pack: {pack}")
+
+    mapping = read_yaml(mapping_path)
+    unknown = sorted(str(key) for key in mapping if key not in _MAPPING_KEYS)
+    if unknown:
+        raise ValueError(
+            f"mapping has unknown key(s): {', '.join(unknown)} "
+            f"(expected {', '.join(_MAPPING_KEYS)})"
+        )
+    fmt = mapping.get("format") or _FORMATS_BY_SUFFIX.get(dataset.suffix.lower())
+    if fmt not in ("csv", "tsv", "ndjson"):
+        raise ValueError(f"cannot determine dataset format (csv, tsv or ndjson): {dataset}")
+    encoding = mapping.get("encoding", "utf-8")
+    kinds = [kind for kind in RECORD_KINDS if kind in mapping]
+    if not kinds:
+        raise ValueError(f"mapping declares no record kinds ({', '.join(RECORD_KINDS)})")
+    for kind in kinds:
+        _compile_records(mapping[kind])  # surface mapping errors before starting workers
+
+    summary = ImportSummary(pack_path=pack, rows=0, records={kind: 0 for kind in kinds})
+    with ExitStack() as stack:
+        f = stack.enter_context(dataset.open("rb"))
+        _skip_bom(f)
+        header = _read_header(f, fmt, encoding)
+
+        # the pack is only created once the mapping and dataset have been checked
+        if not pack.exists():
+            init_pack_skeleton(pack, shards=shards)
+        pack = summary.pack_path = pack.resolve()
+        manifest_path = pack / "ukdb.yaml"
+        manifest = read_yaml(manifest_path)
+        layout = load_layout(manifest)
+        state = (
+            {kind: mapping[kind] for kind in kinds},
+            {kind: layout[kind] for kind in kinds},
+            fmt,
+            encoding,
+            dataset.name,
+            header,
+        )
+
+        writers = {kind: stack.enter_context(RecordWriter(pack, layout[kind])) for kind in kinds}
+        chunks = _iter_chunks(
+            f, chunk_size, first_line=2 if header is not None else 1, quoted=fmt != "ndjson"
+        )
+        for rows, batches in _map_chunks(chunks, state, max_workers):
+            summary.rows += rows
+            for kind, shard, count, text in batches:
+                writers[kind].write_batch(text, shard)
+                summary.records[kind] += count
+
+    # keep digests from an earlier `ukdb hash` current for the files this import appended to
+    hashed = (manifest.get("integrity") or {}).get("files") or {}
+    if hashed:
+        touched = [rel for kind in kinds for rel in layout[kind].paths]
+        digests = sha256_files([pack / rel for rel in touched], max_workers=max_workers)
+        hashed.update(zip(touched, digests))
+    manifest["updated_at"] = now_iso()
+    write_yaml(manifest_path, manifest)
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+
+def _skip_bom(f) -> None:
+    if f.read(len(_UTF8_BOM)) != _UTF8_BOM:
+        f.seek(0)
+
+
+def _read_header(f, fmt: str, encoding: str) -> list[str] | None:
+    if fmt == "ndjson":
+        return None
+    line = f.readline().decode(encoding)
+    header = next(csv.reader([line], delimiter="\t" if fmt == "tsv" else ","), None)
+    if not header:
+        raise ValueError("CSV dataset has no header row")
+    return header
+
+
+def _iter_chunks(
+    f, chunk_size: int, first_line: int, quoted: bool = False
+) -> Iterator[tuple[int, bytes]]:
+    """Yield (first line number, bytes) chunks that end on a record boundary.
+
+    With `quoted` (CSV/TSV), a newline only ends a record when the chunk holds an even number
+    of `"` before it, so quoted fields spanning lines are never split ("" escapes count twice).
+    """
+    line_no = first_line
+    tail = b""
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            if tail:
+                yield line_no, tail
+            return
+        block = tail + block
+        cut = _record_cut(block) if quoted else block.rfind(b"\n") + 1
+        if cut == 0:
+            tail = block
+            continue
+        yield line_no, block[:cut]
+        line_no += block.count(b"\n", 0, cut)
+        tail = block[cut:]
+
+
+def _record_cut(block: bytes) -> int:
+    """Offset just past the last newline outside a quoted field, or 0 if there is none."""
+    total = block.count(b'"')
+    if not total:
+        return block.rfind(b"\n") + 1
+    end = len(block)
+    after = 0
+    while True:
+        pos = block.rfind(b"\n", 0, end)
+        if pos < 0:
+            return 0
+        after += block.count(b'"', pos, end)
+        if (total - after) % 2 == 0:
+            return pos + 1
+        end = pos
+
+
+def _map_chunks(
+    chunks: Iterator[tuple[int, bytes]], state: tuple, max_workers: int | None
+) -> Iterator[tuple[int, list[tuple[str, int | None, int, str]]]]:
+    if max_workers == 1:
+        _init_worker(*state)
+        for chunk in chunks:
+            yield _process_chunk(chunk)
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=state) as pool:
+        in_flight: deque = deque()
+        limit = 2 * workers
+        for chunk in chunks:
+            in_flight.append(pool.submit(_process_chunk, chunk))
+            if len(in_flight) >= limit:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+# per-process state set up by _init_worker
+_WORKER: dict = {}
+
+
+def _init_worker(
+    mapping: dict,
+    layout: dict[str, RecordFiles],
+    fmt: str,
+    encoding: str,
+    label: str,
+    header: list[str] | None,
+) -> None:
+    _WORKER.update(
+        templates={kind: _compile_records(spec) for kind, spec in mapping.items()},
+        layout=layout,
+        fmt=fmt,
+        encoding=encoding,
+        label=label,
+        header=header,
+    )
+
+
+def _process_chunk(chunk: tuple[int, bytes]) -> tuple[int, list[tuple[str, int | None, int, str]]]:
+    """Map one chunk; returns (row count, [(kind, shard, record count, ndjson text)])."""
+    first_line, data = chunk
+    templates: dict[str, list[Callable]] = _WORKER["templates"]
+    layout: dict[str, RecordFiles] = _WORKER["layout"]
+    label = _WORKER["label"]
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+
+    lines: dict[tuple[str, int | None], list[str]] = {}
+    rows = 0
+    for line_no, row in _iter_rows(first_line, data.decode(_WORKER["encoding"])):
+        rows += 1
+        for kind, builders in templates.items():
+            files = layout[kind]
+            for build in builders:
+                try:
+                    record = build(row)
+                    shard = files.partition.shard_index(record, len(files.paths))
+                except (ValueError, KeyError, IndexError) as e:
+                    raise ValueError(f"{label}:{line_no}: {kind}: {_describe(e)}") from None
+                lines.setdefault((kind, shard), []).append(dumps(record))
+
+    batches = [
+        (kind, shard, len(out), "\n".join(out) + "\n") for (kind, shard), out in lines.items()
+    ]
+    return rows, batches
+
+
+def _iter_rows(first_line: int, text: str) -> Iterator[tuple[int, dict]]:
+    label = _WORKER["label"]
+    if _WORKER["fmt"] == "ndjson":
+        for line_no, line in enumerate(text.split("\n"), start=first_line):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line, parse_float=str)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{label}:{line_no}: JSON error: {e}") from None
+            if not isinstance(row, dict):
+                raise ValueError(f"{label}:{line_no}: expected a JSON object")
+            yield line_no, row
+        return
+
+    header: list[str] = _WORKER["header"]
+    delimiter = "\t" if _WORKER["fmt"] == "tsv" else ","
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=delimiter, strict=True)
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            line_no = first_line + reader.line_num - 1
+            raise ValueError(f"{label}:{line_no}: CSV error: {e}") from None
+        if not values:
+            continue
+        line_no = first_line + reader.line_num - 1
+        if len(values) != len(header):
+            raise ValueError(
+                f"{label}:{line_no}: expected {len(header)} column(s), got {len(values)}"
+            )
+        yield line_no, dict(zip(header, values))
+
+
+def _describe(e: Exception) -> str:
+    if isinstance(e, KeyError):
+        return f"missing field {e.args[0]!r}"
+    return str(e)
+
+
+def _compile_records(spec: dict | list) -> list[Callable[[dict], dict]]:
+    specs = spec if isinstance(spec, list) else [spec]
+    for s in specs:
+        if not isinstance(s, dict):
+            raise ValueError("each record mapping must be a mapping of output fields")
+        if "field" in s:
+            raise ValueError("a record mapping cannot itself be a field reference")
+    return [_compile(s) for s in specs]
+
+
+def _compile(spec: object) -> Callable[[dict], object]:
+    if isinstance(spec, dict):
+        if "field" in spec:
+            return _compile_field(spec)
+        for key in spec:
+            if not isinstance(key, str):
+                raise ValueError(f"mapping keys must be strings, got {key!r}")
+        items = [(key, _compile(value)) for key, value in spec.items()]
+        if not _may_omit(spec):
+            return lambda row: {key: fn(row) for key, fn in items}
+
+        def build_dict(row: dict) -> dict:
+            out = {}
+            for key, fn in items:
+                value = fn(row)
+                if value is not _OMIT:
+                    out[key] = value
+            return out
+
+        return build_dict
+    if isinstance(spec, list):
+        fns = [_compile(value) for value in spec]
+        return lambda row: [v for v in (fn(row) for fn in fns) if v is not _OMIT]
+    if isinstance(spec, str) and ("{" in spec or "}" in spec):
+        return _compile_template(spec)
+    if isinstance(spec, float):
+        raise ValueError(f"float literal not allowed in mapping: {spec!r}")
+    if spec is not None and not isinstance(spec, (str, int)):
+        raise ValueError(
+            f"unsupported {type(spec).__name__} literal in mapping: {spec!r} (quote it as a string)"
+        )
+    return lambda row: spec
+
+
+def _compile_template(spec: str) -> Callable[[dict], str]:
+    # (is_field, text) parts, parsed once; only plain field names are allowed
+    parts: list[tuple[bool, str]] = []
+    try:
+        parsed = list(Formatter().parse(spec))
+    except ValueError as e:
+        raise ValueError(f"template {spec!r}: {e}") from None
+    for literal, name, format_spec, conversion in parsed:
+        if literal:
+            parts.append((False, literal))
+        if name is None:
+            continue
+        if not name or format_spec or conversion or "." in name or "[" in name:
+            raise ValueError(f"template {spec!r}: only plain {{field}} names are allowed")
+        parts.append((True, name))
+
+    def render(row: dict) -> str:
+        out = []
+        for is_field, text in parts:
+            if not is_field:
+                out.append(text)
+                continue
+            value = _field_text(row, text)
+            if value is None:
+                raise ValueError(f"missing value for field {text!r}")
+            out.append(value)
+        return "".join(out)
+
+    return render
+
+
+def _field_text(row: dict, name: str) -> str | None:
+    """A field's value as text, or None when it is missing, null or empty."""
+    value = row.get(name)
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise ValueError(f"field {name!r}: expected a string or number, got {value!r}")
+    return str(value)
+
+
+def _may_omit(spec: dict) -> bool:
+    return any(isinstance(v, dict) and "field" in v and v.get("optional") for v in spec.values())
+
+
+def _compile_field(spec: dict) -> Callable[[dict], object]:
+    name = spec["field"]
+    convert = spec.get("convert", "str")
+    optional = bool(spec.get("optional", False))
+    decimal = spec.get("decimal", ".")
+    if convert != "str" and convert not in _SCALES:
+        raise ValueError(f"unknown convert {convert!r} (str, {', '.join(_SCALES)})")
+    scale = _SCALES.get(convert)
+
+    def get(row: dict) -> object:
+        value = _field_text(row, name)
+        if value is None:
+            if optional:
+                return _OMIT
+            raise ValueError(f"missing value for field {name!r}")
+        if scale is None:
+            return value
+        try:
+            return parse_scaled_int(value, scale, decimal)
+        except ValueError as e:
+            raise ValueError(f"field {name!r}: {e}") from None
+
+    return get
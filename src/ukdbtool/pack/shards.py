@@ -0,0 +1,178 @@
+"""Record file layout for UKDB packs.
+
+Each record kind lives either in a single NDJSON file (`claims.ndjson`) or, when the
+manifest declares it under `shards`, in a shard set (`claims/part-00000.ndjson` ...).
+
+Example manifest section:
+
+    shards:
+      claims:
+        count: 4
+        partition: {scheme: hash, key: id}
+      entities:
+        count: 3
+        partition: {scheme: id_range, key: id, boundaries: ["ent_h", "ent_p"]}
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import zlib
+
+
+# record kind -> schema name (schemas/ukdb-<version>/<name>.schema.json)
+RECORD_KINDS: dict[str, str] = {
+    "entities": "entity",
+    "sources": "source",
+    "claims": "claim",
+    "notes": "note",
+    "links": "link",
+}
+
+PARTITION_SCHEMES = ("none", "hash", "id_range")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """How records are assigned to shards.
+
+    - `none`: any record may live in any shard (writers round-robin)
+    - `hash`: crc32 of the key value modulo shard count
+    - `id_range`: sorted lower `boundaries` of shards 1..N-1, compared as strings
+    """
+
+    scheme: str = "none"
+    key: str = "id"
+    boundaries: tuple[str, ...] = ()
+
+    def shard_index(self, record: dict, count: int) -> int | None:
+        if self.scheme == "none":
+            return None
+        if self.key not in record:
+            raise ValueError(f"missing partition key {self.key!r}")
+        value = str(record[self.key])
+        if self.scheme == "hash":
+            return zlib.crc32(value.encode("utf-8")) % count
+        return bisect_right(self.boundaries, value)
+
+
+@dataclass(frozen=True)
+class RecordFiles:
+    kind: str
+    paths: tuple[str, ...]
+    partition: Partition
+    sharded: bool = False
+
+
+def shard_path(kind: str, index: int) -> str:
+    return f"{kind}/part-{index:05d}.ndjson"
+
+
+def load_layout(manifest: dict) -> dict[str, RecordFiles]:
+    """Resolve the record files of every kind, in canonical kind order.
+
+    Raises ValueError when the `shards` section is malformed.
+    """
+    shards = manifest.get("shards") or {}
+    if not isinstance(shards, dict):
+        raise ValueError("shards must be a mapping of record kind to shard set")
+    unknown = sorted(set(shards) - set(RECORD_KINDS))
+    if unknown:
+        raise ValueError(f"shards: unknown record kind(s): {', '.join(unknown)}")
+
+    layout: dict[str, RecordFiles] = {}
+    for kind in RECORD_KINDS:
+        if kind not in shards:
+            layout[kind] = RecordFiles(kind, (f"{kind}.ndjson",), Partition())
+            continue
+        spec = shards[kind] or {}
+        if not isinstance(spec, dict):
+            raise ValueError(f"shards.{kind} must be a mapping with a count")
+        count = spec.get("count")
+        if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+            raise ValueError(f"shards.{kind}.count must be a positive integer")
+        partition = _parse_partition(kind, spec.get("partition") or {}, count)
+        paths = tuple(shard_path(kind, i) for i in range(count))
+        layout[kind] = RecordFiles(kind, paths, partition, sharded=True)
+    return layout
+
+
+def _parse_partition(kind: str, spec: object, count: int) -> Partition:
+    if not isinstance(spec, dict):
+        raise ValueError(f"shards.{kind}.partition must be a mapping")
+    scheme = spec.get("scheme", "none")
+    if scheme not in PARTITION_SCHEMES:
+        raise ValueError(
+            f"shards.{kind}.partition.scheme must be one of {', '.join(PARTITION_SCHEMES)}"
+        )
+    key = spec.get("key", "id")
+    if not isinstance(key, str):
+        raise ValueError(f"shards.{kind}.partition.key must be a string")
+    boundaries = spec.get("boundaries") or ()
+    if not isinstance(boundaries, (list, tuple)) or not all(
+        isinstance(b, str) for b in boundaries
+    ):
+        raise ValueError(f"shards.{kind}.partition.boundaries must be a list of strings")
+    boundaries = tuple(boundaries)
+    if scheme == "id_range":
+        if len(boundaries) != count - 1:
+            raise ValueError(
+                f"shards.{kind}.partition.boundaries must list {count - 1} value(s) for "
+                f"{count} shard(s)"
+            )
+        if list(boundaries) != sorted(boundaries) or len(set(boundaries)) != len(boundaries):
+            raise ValueError(f"shards.{kind}.partition.boundaries must be strictly ascending")
+    return Partition(scheme=scheme, key=key, boundaries=boundaries)
+
+
+def unlisted_record_files(pack: Path, layout: dict[str, RecordFiles]) -> list[str]:
+    """Record files present in the pack that the layout does not cover.
+
+    E.g. a leftover `claims.ndjson` next to a claims shard set, or shards beyond `count`.
+    """
+    found: list[str] = []
+    for kind, files in layout.items():
+        expected = set(files.paths)
+        candidates = [pack / f"{kind}.ndjson", *sorted((pack / kind).glob("*.ndjson"))]
+        for path in candidates:
+            rel = path.relative_to(pack).as_posix()
+            if path.is_file() and rel not in expected:
+                found.append(rel)
+    return found
+
+
+class RecordWriter:
+    """Append records to a kind's file(s), routing each to its shard."""
+
+    def __init__(self, pack: Path, files: RecordFiles, mode: str = "a") -> None:
+        self.pack = pack
+        self.files = files
+        self.mode = mode
+        self._handles: list = []
+        self._next = 0
+
+    def __enter__(self) -> RecordWriter:
+        for rel in self.files.paths:
+            path = self.pack / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._handles.append(path.open(self.mode, encoding="utf-8"))
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        for f in self._handles:
+            f.close()
+        self._handles = []
+
+    def write(self, record: dict) -> None:
+        index = self.files.partition.shard_index(record, len(self._handles))
+        self.write_batch(json.dumps(record, ensure_ascii=False) + "\n", index)
+
+    def write_batch(self, text: str, shard: int | None = None) -> None:
+        """Write pre-serialized NDJSON lines to one shard (round-robin when None)."""
+        if shard is None:
+            shard = self._next
+            self._next = (self._next + 1) % len(self._handles)
+        self._handles[shard].write(text)
@@ -1,16 +1,18 @@
 from __future__ import annotations
 
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from jsonschema import Draft202012Validator
 from rich.console import Console
 
 from ukdbtool.io.yamlio import read_yaml
+from ukdbtool.pack.shards import RECORD_KINDS, Partition, load_layout, unlisted_record_files
 
 console = Console()
 
 
-def validate_pack(pack: Path) -> bool:
+def validate_pack(pack: Path, max_workers: int | None = None) -> bool:
     pack = pack if pack.suffix == ".ukdb" else Path(str(pack) + ".ukdb")
 
     ok = True
@@ -26,12 +28,34 @@ def validate_pack(pack: Path) -> bool:
     ok &= _validate_no_floats(manifest, "ukdb.yaml")
     _warn_ambiguous_numeric_fields(manifest, "ukdb.yaml")
 
-    # validate ndjson lines
-    ok &= _validate_ndjson(pack / "entities.ndjson", schema_dir / "entity.schema.json")
-    ok &= _validate_ndjson(pack / "sources.ndjson", schema_dir / "source.schema.json")
-    ok &= _validate_ndjson(pack / "claims.ndjson", schema_dir / "claim.schema.json")
-    ok &= _validate_ndjson(pack / "notes.ndjson", schema_dir / "note.schema.json")
-    ok &= _validate_ndjson(pack / "links.ndjson", schema_dir / "link.schema.json")
+    try:
+        layout = load_layout(manifest)
+    except ValueError as e:
+        console.print(f"[red]ukdb.yaml[/red] {e}")
+        return False
+
+    # records outside the layout would go unread by every tool
+    for rel in unlisted_record_files(pack, layout):
+        console.print(f"[red]Unlisted record file:[/red] {rel} (not covered by ukdb.yaml layout)")
+        ok = False
+
+    # validate ndjson lines; shard sets are checked concurrently, one file per task
+    jobs = []
+    for kind, files in layout.items():
+        schema_path = schema_dir / f"{RECORD_KINDS[kind]}.schema.json"
+        for idx, rel in enumerate(files.paths):
+            shard = (idx, len(files.paths), files.partition) if files.sharded else None
+            jobs.append((pack / rel, schema_path, rel, shard))
+
+    if any(files.sharded for files in layout.values()) and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_check_ndjson, *zip(*jobs)))
+    else:
+        results = [_check_ndjson(*job) for job in jobs]
+    for file_ok, messages in results:
+        for msg in messages:
+            console.print(msg)
+        ok &= file_ok
 
     if ok:
         console.print("[green]OK:[/green] Pack is valid")
@@ -40,28 +64,58 @@ def validate_pack(pack: Path) -> bool:
     return ok
 
 
-def _validate_ndjson(path: Path, schema_path: Path) -> bool:
+def _check_ndjson(
+    path: Path,
+    schema_path: Path,
+    label: str,
+    shard: tuple[int, int, Partition] | None = None,
+) -> tuple[bool, list[str]]:
+    """Validate one NDJSON file, returning (ok, console messages).
+
+    Messages are collected rather than printed so shards can be checked in worker processes.
+    `shard` is (index, count, partition) for files belonging to a shard set.
+    """
     if not path.exists():
-        console.print(f"[red]Missing file:[/red] {path.name}")
-        return False
+        return False, [f"[red]Missing file:[/red] {label}"]
     schema = json.loads(schema_path.read_text(encoding="utf-8-sig"))
     validator = Draft202012Validator(schema)
     ok = True
-    for i, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
-        if not line.strip():
-            continue
-        try:
-            obj = json.loads(line)
-        except json.JSONDecodeError as e:
-            console.print(f"[red]{path.name}:{i} JSON error:[/red] {e}")
-            ok = False
-            continue
-        for err in validator.iter_errors(obj):
-            console.print(f"[red]{path.name}:{i}[/red] {err.message}")
-            ok = False
-        ok &= _validate_no_floats(obj, f"{path.name}:{i}")
-        _warn_ambiguous_numeric_fields(obj, f"{path.name}:{i}")
-    return ok
+    messages: list[str] = []
+    with path.open("r", encoding="utf-8") as f:
+        for i, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                messages.append(f"[red]{label}:{i} JSON error:[/red] {e}")
+                ok = False
+                continue
+            for err in validator.iter_errors(obj):
+                messages.append(f"[red]{label}:{i}[/red] {err.message}")
+                ok = False
+            for float_path in _find_floats(obj):
+                messages.append(f"[red]{label}:{i}[/red] float value not allowed at {float_path}")
+                ok = False
+            for num_path, key in _find_ambiguous_numeric_fields(obj):
+                messages.append(
+                    f"[yellow]WARN:[/yellow] {label}:{i} ambiguous numeric field {num_path}.{key}"
+                )
+            if shard is not None and isinstance(obj, dict):
+                idx, count, partition = shard
+                try:
+                    expected = partition.shard_index(obj, count)
+                except ValueError as e:
+                    messages.append(f"[red]{label}:{i}[/red] {e}")
+                    ok = False
+                    continue
+                if expected is not None and expected != idx:
+                    messages.append(
+                        f"[red]{label}:{i}[/red] record belongs in shard {expected} "
+                        f"({partition.scheme} partition)"
+                    )
+                    ok = False
+    return ok, messages
 
 
 def _validate_json(obj: dict, schema_path: Path, label: str) -> bool:
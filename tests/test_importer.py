@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ukdbtool.pack.hash import sha256_file, write_integrity_hashes
+from ukdbtool.pack.importer import import_dataset, parse_scaled_int
+from ukdbtool.pack.validate import validate_pack
+from ukdbtool.io.yamlio import read_yaml
+
+
+MAPPING = """\
+entities:
+  id: "ent_{employee_id}"
+  type: employee
+  name: "{name}"
+claims:
+  - id: "clm_{employee_id}_salary"
+    subject: "ent_{employee_id}"
+    predicate: gross_salary
+    object:
+      type: money_cents
+      value: {field: salary, convert: cents}
+  - id: "clm_{employee_id}_tax"
+    subject: "ent_{employee_id}"
+    predicate: income_tax_rate
+    object:
+      type: rate_bp
+      value: {field: tax_rate, convert: bp, decimal: ","}
+      note: {field: note, optional: true}
+"""
+
+
+def _write_dataset(tmp_path: Path, rows: int) -> tuple[Path, Path]:
+    dataset = tmp_path / "employees.csv"
+    lines = ["employee_id,name,salary,tax_rate,note"]
+    for i in range(rows):
+        note = "x" if i % 2 else ""
+        lines.append(f'{i},"Näme, {i}",{1000 + i}.{i % 100:02d},"{i % 60},5",{note}')
+    dataset.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    mapping = tmp_path / "mapping.yaml"
+    mapping.write_text(MAPPING, encoding="utf-8")
+    return dataset, mapping
+
+
+def test_parse_scaled_int() -> None:
+    assert parse_scaled_int("12.34", 2) == 1234
+    assert parse_scaled_int("-0.5", 2) == -50
+    assert parse_scaled_int("25", 2) == 2500
+    assert parse_scaled_int(".07", 2) == 7
+    assert parse_scaled_int("1,50", 2, decimal=",") == 150
+    assert parse_scaled_int("3.100", 2) == 310
+    for bad in ["", "-", "1.2.3", "1e5", "12.345", "abc"]:
+        with pytest.raises(ValueError):
+            parse_scaled_int(bad, 2)
+
+
+def test_import_csv_creates_valid_pack(tmp_path: Path) -> None:
+    dataset, mapping = _write_dataset(tmp_path, 50)
+    summary = import_dataset(dataset, tmp_path / "out", mapping, max_workers=1, chunk_size=256)
+
+    assert summary.rows == 50
+    assert summary.records == {"entities": 50, "claims": 100}
+    pack_dir = summary.pack_path
+    entities = [json.loads(line) for line in (pack_dir / "entities.ndjson").open(encoding="utf-8")]
+    assert [e["id"] for e in entities] == [f"ent_{i}" for i in range(50)]
+    assert entities[3]["name"] == "Näme, 3"
+
+    claims = [json.loads(line) for line in (pack_dir / "claims.ndjson").open(encoding="utf-8")]
+    assert claims[6] == {
+        "id": "clm_3_salary",
+        "subject": "ent_3",
+        "predicate": "gross_salary",
+        "object": {"type": "money_cents", "value": 100303},
+    }
+    assert claims[7]["object"] == {"type": "rate_bp", "value": 350, "note": "x"}
+    assert "note" not in claims[1]["object"]
+    assert validate_pack(pack_dir)
+
+
+def test_import_parallel_sharded_matches_inline(tmp_path: Path) -> None:
+    dataset, mapping = _write_dataset(tmp_path, 300)
+    shards = {"claims": {"count": 3, "partition": {"scheme": "hash"}}}
+    kwargs = {"shards": shards, "chunk_size": 512}
+    inline = import_dataset(dataset, tmp_path / "a", mapping, max_workers=1, **kwargs)
+    parallel = import_dataset(dataset, tmp_path / "b", mapping, max_workers=2, **kwargs)
+
+    assert parallel.records == inline.records == {"entities": 300, "claims": 600}
+    for rel in ["entities.ndjson"] + [f"claims/part-0000{i}.ndjson" for i in range(3)]:
+        assert (parallel.pack_path / rel).read_bytes() == (inline.pack_path / rel).read_bytes()
+    assert validate_pack(parallel.pack_path)
+
+
+def test_import_ndjson_keeps_decimals_exact(tmp_path: Path) -> None:
+    dataset = tmp_path / "prices.ndjson"
+    dataset.write_text(
+        '{"sku": "a", "price": 19.99}\n{"sku": "b", "price": 0.29}\n\n{"sku": "c", "price": 7}\n',
+        encoding="utf-8",
+    )
+    mapping = tmp_path / "mapping.yaml"
+    mapping.write_text(
+        'entities:\n  id: "ent_{sku}"\n  type: product\n  name: "{sku}"\n'
+        '  price_cents: {field: price, convert: cents}\n',
+        encoding="utf-8",
+    )
+    summary = import_dataset(dataset, tmp_path / "out", mapping, max_workers=1)
+    lines = (summary.pack_path / "entities.ndjson").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["price_cents"] for line in lines] == [1999, 29, 700]
+
+
+def test_import_ndjson_with_bom_copies_fields_as_strings(tmp_path: Path) -> None:
+    dataset = tmp_path / "items.ndjson"
+    dataset.write_bytes(
+        b"\xef\xbb\xbf" + b'{"n": 7, "w": 1.50, "s": "x"}\n{"n": 8, "w": 2, "s": "y"}\n'
+    )
+    mapping = tmp_path / "mapping.yaml"
+    mapping.write_text(
+        'entities:\n  id: "ent_{s}"\n  type: item\n  name: {field: s}\n'
+        '  code: {field: n}\n  weight: {field: w}\n',
+        encoding="utf-8",
+    )
+    summary = import_dataset(dataset, tmp_path / "out", mapping, max_workers=1)
+    lines = (summary.pack_path / "entities.ndjson").read_text(encoding="utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [(r["code"], r["weight"]) for r in records] == [("7", "1.50"), ("8", "2")]
+    assert validate_pack(summary.pack_path)
+
+    (tmp_path / "nested.ndjson").write_text('{"s": "z", "n": [1], "w": 1}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match=r"nested\.ndjson:1: entities: field 'n'"):
+        import_dataset(tmp_path / "nested.ndjson", tmp_path / "out", mapping, max_workers=1)
+
+
+def test_import_rejects_bad_arguments_and_mappings(tmp_path: Path) -> None:
+    dataset, mapping = _write_dataset(tmp_path, 5)
+    with pytest.raises(ValueError, match="chunk_size"):
+        import_dataset(dataset, tmp_path / "out", mapping, chunk_size=0)
+    with pytest.raises(ValueError, match="max_workers"):
+        import_dataset(dataset, tmp_path / "out", mapping, max_workers=0)
+
+    scalar = tmp_path / "scalar.yaml"
+    scalar.write_text("notes: {field: name, optional: true}\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="field reference"):
+        import_dataset(dataset, tmp_path / "out", scalar, max_workers=1)
+
+
+def test_import_reports_bad_row(tmp_path: Path) -> None:
+    dataset, mapping = _write_dataset(tmp_path, 5)
+    with dataset.open("a", encoding="utf-8") as f:
+        f.write("5,late,12.345,1,\n")
+    with pytest.raises(ValueError, match=r"employees\.csv:7: claims: field 'salary'"):
+        import_dataset(dataset, tmp_path / "out", mapping, max_workers=1)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 7, 13, 4096])
+def test_import_csv_quoted_newlines_independent_of_chunk_size(
+    tmp_path: Path, chunk_size: int
+) -> None:
+    dataset = tmp_path / "quoted.csv"
+    dataset.write_bytes(b'id,name\n1,"a\nx,y"\n2,"say ""hi""\n"\n3,c\n')
+    mapping = tmp_path / "mapping.yaml"
+    mapping.write_text('entities: {id: "ent_{id}", type: x, name: "{name}"}\n', encoding="utf-8")
+
+    kwargs = {"chunk_size": chunk_size, "max_workers": 1}
+    summary = import_dataset(dataset, tmp_path / "out", mapping, **kwargs)
+    lines = (summary.pack_path / "entities.ndjson").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["a\nx,y", 'say "hi"\n', "c"]
+
+    dataset.write_bytes(b'id,name\n1,b\n2,"open\n')
+    with pytest.raises(ValueError, match=r"quoted\.csv:3: CSV error"):
+        import_dataset(dataset, tmp_path / "out", mapping, **kwargs)
+
+
+@pytest.mark.parametrize(
+    ("mapping_text", "message"),
+    [
+        ('entities: {id: "ent_{id}", type: x, name: "{n}"}\nclaim: {}\n', "unknown key"),
+        ('entities: {id: "ent_{id}", type: x, name: "{id.__class__}"}\n', "plain"),
+        ('entities: {id: "ent_{id!r}", type: x, name: n}\n', "plain"),
+        ('entities: {id: "ent_{id}", type: x, name: n, retrieved_at: 2024-01-01}\n', "date"),
+        ('entities: {id: "ent_{id}", type: x, name: {field: n, convert: pounds}}\n', "convert"),
+    ],
+)
+def test_import_rejects_bad_mapping_without_creating_pack(
+    tmp_path: Path, mapping_text: str, message: str
+) -> None:
+    dataset, _ = _write_dataset(tmp_path, 2)
+    mapping = tmp_path / "bad.yaml"
+    mapping.write_text(mapping_text, encoding="utf-8")
+    shards = {"entities": {"count": 2}}
+    for _ in range(2):
+        with pytest.raises(ValueError, match=message):
+            import_dataset(dataset, tmp_path / "out", mapping, shards=shards)
+    assert not (tmp_path / "out.ukdb").exists()
+
+
+def test_import_missing_dataset_creates_no_pack(tmp_path: Path) -> None:
+    _, mapping = _write_dataset(tmp_path, 1)
+    with pytest.raises(FileNotFoundError):
+        import_dataset(tmp_path / "missing.csv", tmp_path / "out", mapping)
+    assert not (tmp_path / "out.ukdb").exists()
+
+
+def test_import_templates_reject_non_scalar_values(tmp_path: Path) -> None:
+    mapping = tmp_path / "mapping.yaml"
+    mapping.write_text('entities: {id: "ent_{s}", type: x, name: "{flag}-{n}"}\n', encoding="utf-8")
+    dataset = tmp_path / "rows.ndjson"
+    dataset.write_text('{"s": "a", "flag": "on", "n": 1}\n', encoding="utf-8")
+    summary = import_dataset(dataset, tmp_path / "out", mapping, max_workers=1)
+    line = (summary.pack_path / "entities.ndjson").read_text(encoding="utf-8")
+    assert json.loads(line)["name"] == "on-1"
+
+    for row, message in [
+        ('{"s": "b", "flag": true, "n": 1}', "field 'flag'"),
+        ('{"s": "b", "flag": "on", "n": null}', "missing value for field 'n'"),
+        ('{"s": "b", "flag": "on", "n": {"x": 1}}', "field 'n'"),
+    ]:
+        dataset.write_text(row + "\n", encoding="utf-8")
+        with pytest.raises(ValueError, match=rf"rows\.ndjson:1: entities: {message}"):
+            import_dataset(dataset, tmp_path / "out", mapping, max_workers=1)
+
+
+def test_import_refreshes_existing_integrity_digests(tmp_path: Path) -> None:
+    dataset, mapping = _write_dataset(tmp_path, 5)
+    summary = import_dataset(dataset, tmp_path / "out", mapping, max_workers=1)
+    pack_dir = summary.pack_path
+    write_integrity_hashes(pack_dir)
+
+    import_dataset(dataset, pack_dir, mapping, max_workers=1)
+    files = read_yaml(pack_dir / "ukdb.yaml")["integrity"]["files"]
+    for name in ["entities.ndjson", "claims.ndjson", "notes.ndjson"]:
+        assert files[name] == sha256_file(pack_dir / name)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ukdbtool.pack.build import init_pack_skeleton, build_pack
+from ukdbtool.pack.validate import validate_pack
+from ukdbtool.pack.hash import write_integrity_hashes
+from ukdbtool.pack.shards import RecordWriter, load_layout
+from ukdbtool.io.yamlio import read_yaml, write_yaml
+
+
+def test_sharded_skeleton_validates_and_hashes(tmp_path: Path) -> None:
+    pack_dir = tmp_path / "sharded.ukdb"
+    init_pack_skeleton(
+        pack_dir,
+        shards={
+            "claims": {"count": 3, "partition": {"scheme": "hash"}},
+            "entities": {
+                "count": 2,
+                "partition": {"scheme": "id_range", "boundaries": ["ent_m"]},
+            },
+        },
+    )
+
+    for name in [
+        "claims/part-00000.ndjson",
+        "claims/part-00002.ndjson",
+        "entities/part-00001.ndjson",
+        "sources.ndjson",
+    ]:
+        assert (pack_dir / name).exists()
+    assert not (pack_dir / "claims.ndjson").exists()
+
+    layout = load_layout(read_yaml(pack_dir / "ukdb.yaml"))
+    with RecordWriter(pack_dir, layout["claims"]) as w:
+        for i in range(20):
+            w.write({"id": f"clm_{i:03d}", "subject": "ent_a", "predicate": "p",
+                     "object": {"type": "int", "value": i}})
+    with RecordWriter(pack_dir, layout["entities"]) as w:
+        for ent_id in ["ent_a", "ent_z", "ent_b"]:
+            w.write({"id": ent_id, "type": "concept", "name": ent_id})
+
+    entities_0 = (pack_dir / "entities/part-00000.ndjson").read_text(encoding="utf-8")
+    assert "ent_z" not in entities_0
+    claim_lines = [
+        line
+        for rel in layout["claims"].paths
+        for line in (pack_dir / rel).read_text(encoding="utf-8").splitlines()
+    ]
+    assert len(claim_lines) == 20
+
+    assert validate_pack(pack_dir)
+    assert validate_pack(pack_dir, max_workers=1)
+
+    write_integrity_hashes(pack_dir)
+    files = read_yaml(pack_dir / "ukdb.yaml")["integrity"]["files"]
+    assert "claims/part-00001.ndjson" in files
+    assert "entities/part-00000.ndjson" in files
+    assert "claims.ndjson" not in files
+    assert validate_pack(pack_dir)
+
+
+def test_validate_rejects_misplaced_record_and_missing_shard(tmp_path: Path) -> None:
+    pack_dir = tmp_path / "bad.ukdb"
+    init_pack_skeleton(
+        pack_dir,
+        shards={"entities": {"count": 2, "partition": {"scheme": "id_range", "boundaries": ["m"]}}},
+    )
+    (pack_dir / "entities/part-00000.ndjson").write_text(
+        json.dumps({"id": "z", "type": "concept", "name": "z"}) + "\n", encoding="utf-8"
+    )
+    assert not validate_pack(pack_dir, max_workers=1)
+
+    (pack_dir / "entities/part-00000.ndjson").write_text("", encoding="utf-8")
+    (pack_dir / "entities/part-00001.ndjson").unlink()
+    assert not validate_pack(pack_dir, max_workers=1)
+
+
+def test_validate_rejects_malformed_shard_declaration(tmp_path: Path) -> None:
+    pack_dir = tmp_path / "bad.ukdb"
+    init_pack_skeleton(pack_dir)
+    manifest = read_yaml(pack_dir / "ukdb.yaml")
+    manifest["shards"] = {"claims": {"count": 2, "partition": {"scheme": "id_range"}}}
+    write_yaml(pack_dir / "ukdb.yaml", manifest)
+    assert not validate_pack(pack_dir)
+
+
+@pytest.mark.parametrize(
+    "shards",
+    [
+        {"claims": 4},
+        {"claims": {"count": 2, "partition": "hash"}},
+        {"claims": {"count": 2, "partition": {"scheme": "id_range", "boundaries": [5]}}},
+        {"claims": {"count": 2, "partition": {"scheme": "id_range", "boundaries": "m"}}},
+    ],
+)
+def test_load_layout_rejects_malformed_types(tmp_path: Path, shards: dict) -> None:
+    with pytest.raises(ValueError):
+        load_layout({"shards": shards})
+
+    pack_dir = tmp_path / "bad.ukdb"
+    init_pack_skeleton(pack_dir)
+    manifest = read_yaml(pack_dir / "ukdb.yaml")
+    manifest["shards"] = shards
+    write_yaml(pack_dir / "ukdb.yaml", manifest)
+    assert not validate_pack(pack_dir)
+
+
+def test_validate_reports_unlisted_record_files(tmp_path: Path) -> None:
+    pack_dir = tmp_path / "stray.ukdb"
+    init_pack_skeleton(pack_dir, shards={"claims": {"count": 2}})
+    assert validate_pack(pack_dir, max_workers=1)
+
+    (pack_dir / "claims.ndjson").write_text("", encoding="utf-8")
+    assert not validate_pack(pack_dir, max_workers=1)
+
+    (pack_dir / "claims.ndjson").unlink()
+    (pack_dir / "claims/part-00002.ndjson").write_text("", encoding="utf-8")
+    assert not validate_pack(pack_dir, max_workers=1)
+
+
+def test_build_writes_sharded_sources(tmp_path: Path) -> None:
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(5):
+        (input_dir / f"f{i}.txt").write_text(f"file {i}", encoding="utf-8")
+
+    out_pack = tmp_path / "built"
+    build_pack(input_dir, out_pack, shards={"sources": {"count": 2}})
+    pack_dir = Path(str(out_pack) + ".ukdb")
+
+    lines = [
+        (pack_dir / f"sources/part-0000{i}.ndjson").read_text(encoding="utf-8").splitlines()
+        for i in range(2)
+    ]
+    assert [len(part) for part in lines] == [3, 2]
+    assert validate_pack(pack_dir)